@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class LatestFrameCapture:
+    """Camera reader that always serves the newest frame.
+
+    A grab thread reads from the driver continuously and keeps only the
+    latest frame with its capture time (time.monotonic()), so a slow
+    consumer skips stale frames instead of working through the driver's
+    queue. read() is a drop-in for cv2.VideoCapture.read(); the capture
+    time of the frame it returned is in `frame_ts`.
+
+    Setting `max_fps` throttles decoding: frames are still grabbed from the
+    driver so the next decoded one is fresh, but only decoded at that rate.
+    """
+
+    def __init__(self, source=0, width: Optional[int] = None, height: Optional[int] = None,
+                 fps: Optional[float] = None, fourcc: Optional[str] = None, buffer_size: int = 1):
+        self.source = source
+        self.cap = cv2.VideoCapture(source)
+        if self.cap.isOpened():
+            # FOURCC first: some drivers only offer high resolutions as MJPG
+            if fourcc:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            if width:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            if height:
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+            if buffer_size:
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._ts = 0.0
+        self._seq = 0
+        self._served = 0
+        self._failed = False
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.frame_ts = 0.0
+        self.dropped = 0
+        self.max_fps: Optional[float] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def start(self):
+        if self._thread is None and self.cap.isOpened():
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name="capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def _grab_loop(self):
+        last = 0.0
+        while self._running:
+            ok = self.cap.grab()
+            ts = time.monotonic()
+            limit = self.max_fps
+            if ok and limit and ts - last < 1.0 / limit:
+                continue
+            frame = None
+            if ok:
+                ok, frame = self.cap.retrieve()
+                last = ts
+            with self._cond:
+                if not ok:
+                    self._failed = True
+                    self._cond.notify_all()
+                    break
+                self._frame, self._ts = frame, ts
+                self._seq += 1
+                self._cond.notify_all()
+
+    def read(self, timeout: float = 2.0):
+        """Wait for a frame newer than the last one served."""
+        if self._thread is None:
+            self.start()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._served or self._failed or not self._running, timeout):
+                return False, None
+            if self._seq <= self._served:
+                return False, None
+            self.dropped += self._seq - self._served - 1
+            self._served = self._seq
+            self.frame_ts = self._ts
+            # The grab thread allocates a fresh array per read, so the caller owns this one
+            return True, self._frame
+
+    def negotiated(self) -> dict:
+        """What the driver actually agreed to."""
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else ""
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": float(self.cap.get(cv2.CAP_PROP_FPS)),
+            "fourcc": fourcc,
+        }
+
+    def release(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Every frame of a video file or image sequence (no dropping), optionally looped.
+
+    With `pace` the file plays back at its own frame rate (CAP_PROP_FPS,
+    `default_fps` if the container has none) instead of as fast as it
+    decodes, so replays load the app like a live camera. `max_fps` lowers
+    the rate further, as it does for LatestFrameCapture.
+    """
+
+    def __init__(self, path: str, loop: bool = False, pace: bool = False, default_fps: float = 30.0):
+        self.path = path
+        self.loop = loop
+        self.pace = pace
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0.0
+        self.fps = fps if fps and fps > 0 else default_fps
+        self._next = 0.0
+        self.frame_ts = 0.0
+        self.dropped = 0
+        self.max_fps: Optional[float] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def start(self):
+        return self
+
+    def read(self):
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        if ok and self.pace:
+            rate = min(self.fps, self.max_fps) if self.max_fps else self.fps
+            now = time.monotonic()
+            if self._next > now:
+                time.sleep(self._next - now)
+            # Running late starts a new schedule instead of bursting to catch up
+            self._next = max(self._next, now) + 1.0 / rate
+        self.frame_ts = time.monotonic()
+        return ok, frame
+
+    def negotiated(self) -> dict:
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.fps,
+            "fourcc": "file",
+        }
+
+    def release(self):
+        self.cap.release()
+
+
+class LatencyStats:
+    """Rolling latency window in milliseconds."""
+
+    def __init__(self, window: int = 300):
+        self._samples = deque(maxlen=window)
+
+    def add(self, ms: float):
+        self._samples.append(ms)
+
+    def add_since(self, ts: float):
+        self.add((time.monotonic() - ts) * 1000.0)
+
+    def summary(self) -> dict:
+        if not self._samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        s = sorted(self._samples)
+        n = len(s)
+        return {
+            "count": n,
+            "mean_ms": round(sum(s) / n, 2),
+            "p50_ms": round(s[n // 2], 2),
+            "p95_ms": round(s[min(n - 1, int(n * 0.95))], 2),
+            "max_ms": round(s[-1], 2),
+        }
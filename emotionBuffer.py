@@ -0,0 +1,103 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+# Same order DeepFace uses for its emotion model outputs
+EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+EMOTION_CODES = {e: i for i, e in enumerate(EMOTIONS)}
+UNKNOWN = -1
+
+
+class EmotionRingBuffer:
+    """Fixed-capacity history of recent emotion samples.
+
+    Samples live in preallocated numpy columns, so memory stays constant no
+    matter how long a session runs. Appends overwrite the oldest sample once
+    the buffer is full. Writer (CameraWorker thread) and readers (GUI thread)
+    share a lock; queries copy out the window they need.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._ts = np.zeros(self.capacity, dtype=np.float64)
+        self._face = np.zeros(self.capacity, dtype=np.int32)
+        self._emo = np.full(self.capacity, UNKNOWN, dtype=np.int8)
+        self._conf = np.zeros(self.capacity, dtype=np.uint8)
+        self._head = 0      # next write position
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._size = 0
+
+    def append(self, emotion: str, confidence: int, face_id: int = 0, ts: Optional[float] = None):
+        code = EMOTION_CODES.get((emotion or "").lower(), UNKNOWN)
+        with self._lock:
+            i = self._head
+            self._ts[i] = time.time() if ts is None else ts
+            self._face[i] = face_id
+            self._emo[i] = code
+            self._conf[i] = max(0, min(100, int(confidence)))
+            self._head = (i + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None, face_id: Optional[int] = None):
+        """Return (ts, face_id, emotion_code, confidence) arrays, oldest first."""
+        with self._lock:
+            if self._size < self.capacity:
+                idx = np.arange(self._size)
+            else:
+                idx = (np.arange(self.capacity) + self._head) % self.capacity
+            ts, face = self._ts[idx], self._face[idx]
+            emo, conf = self._emo[idx], self._conf[idx]
+
+        mask = np.ones(len(ts), dtype=bool)
+        if seconds is not None:
+            now = time.time() if now is None else now
+            mask &= ts >= now - seconds
+        if face_id is not None:
+            mask &= face == face_id
+        return ts[mask], face[mask], emo[mask], conf[mask]
+
+    def shares(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, float]:
+        """Fraction of samples per emotion over the last `seconds`."""
+        _, _, emo, _ = self.window(seconds, now)
+        emo = emo[emo >= 0]
+        if emo.size == 0:
+            return {e: 0.0 for e in EMOTIONS}
+        counts = np.bincount(emo, minlength=len(EMOTIONS))
+        return {e: float(c) / emo.size for e, c in zip(EMOTIONS, counts)}
+
+    def series(self, seconds: float, bins: int, emotion: Optional[str] = None, now: Optional[float] = None) -> np.ndarray:
+        """Bin the last `seconds` into `bins` slots for a sparkline.
+
+        With `emotion` set, each slot is that emotion's share of the samples
+        in the slot; otherwise it is the mean confidence (0..1). Empty slots
+        are NaN.
+        """
+        now = time.time() if now is None else now
+        ts, _, emo, conf = self.window(seconds, now)
+        out = np.full(bins, np.nan)
+        if ts.size == 0:
+            return out
+        slot = ((ts - (now - seconds)) / seconds * bins).astype(np.int64)
+        np.clip(slot, 0, bins - 1, out=slot)
+        totals = np.bincount(slot, minlength=bins)
+        if emotion is None:
+            values = np.bincount(slot, weights=conf / 100.0, minlength=bins)
+        else:
+            hit = (emo == EMOTION_CODES.get(emotion.lower(), UNKNOWN)).astype(np.float64)
+            values = np.bincount(slot, weights=hit, minlength=bins)
+        filled = totals > 0
+        out[filled] = values[filled] / totals[filled]
+        return out
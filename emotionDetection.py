@@ -1,19 +1,18 @@
 import cv2
 import matplotlib.pyplot as plt
 
+from faceDetectors import make_detector
+
+DETECTOR = "haar"   # "haar" or "yunet"
+
 def run():
     imagePath = "input_image.jpg"  # make sure this file exists in the same folder
     img = cv2.imread(imagePath)
     if img is None:
         raise FileNotFoundError(f"Could not read {imagePath}")
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    face_classifier = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    faces = face_classifier.detectMultiScale(
-        gray, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40)
-    )
+    face_detector = make_detector(DETECTOR, min_face=40)
+    faces = face_detector.detect(img)
     for (x, y, w, h) in faces:
         cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 3)
 
@@ -0,0 +1,185 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from emotionBuffer import EMOTIONS
+
+# optional deepface (kept graceful if it's missing)
+try:
+    from deepface import DeepFace
+    HAVE_DEEPFACE = True
+except Exception:
+    DeepFace = None
+    HAVE_DEEPFACE = False
+
+try:
+    import onnxruntime as ort
+    HAVE_ONNXRUNTIME = True
+except Exception:
+    ort = None
+    HAVE_ONNXRUNTIME = False
+
+try:
+    import onnx
+    HAVE_ONNX = True
+except Exception:
+    onnx = None
+    HAVE_ONNX = False
+
+FLOAT_MODEL = "models/emotion.onnx"
+INT8_MODEL = "models/emotion.int8.onnx"
+
+Result = Tuple[str, int, Dict[str, float]]   # (emotion, confidence%, scores%)
+
+# Ops a softmax output may pass through on its way to the graph output
+_PASS_THROUGH_OPS = {"DequantizeLinear", "QuantizeLinear", "Identity", "Reshape", "Flatten", "Squeeze", "Cast"}
+
+
+class EmotionClassifier(ABC):
+    """Common interface over emotion models.
+
+    predict() takes preprocessed faces, shape (N, 48, 48, 1) float32 in
+    [0, 1] as produced by preprocess.FramePreprocessor, and returns
+    (N, 7) scores in percent in the order of emotionBuffer.EMOTIONS.
+    """
+    name = "base"
+
+    @abstractmethod
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        ...
+
+    def classify(self, faces: np.ndarray, crops: Optional[Sequence] = None) -> List[Result]:
+        if len(faces) == 0:
+            return []
+        return [to_result(row) for row in self.predict(faces)]
+
+
+def to_result(scores) -> Result:
+    i = int(np.argmax(scores))
+    return EMOTIONS[i], int(round(float(scores[i]))), {e: float(s) for e, s in zip(EMOTIONS, scores)}
+
+
+class DeepFaceEmotion(EmotionClassifier):
+    """DeepFace's emotion CNN, fed our tensors directly.
+
+    If the underlying Keras model cannot be reached in the installed
+    DeepFace version, falls back to DeepFace.analyze on the BGR crops
+    (which does its own resize/normalize).
+    """
+    name = "deepface"
+
+    def __init__(self):
+        if not HAVE_DEEPFACE:
+            raise RuntimeError("deepface is not installed.")
+        self.model = None
+        try:
+            try:
+                client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+            except TypeError:
+                client = DeepFace.build_model("Emotion")
+            self.model = getattr(client, "model", client)
+            if not hasattr(self.model, "predict"):
+                self.model = None
+        except Exception:
+            self.model = None
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            raise RuntimeError("DeepFace emotion model not available; use classify() with crops.")
+        if hasattr(self.model, "predict_on_batch"):
+            probs = self.model.predict_on_batch(faces)
+        else:
+            probs = self.model.predict(faces, verbose=0)
+        return np.asarray(probs, dtype=np.float32) * 100.0
+
+    def classify(self, faces: np.ndarray, crops: Optional[Sequence] = None) -> List[Result]:
+        if self.model is not None:
+            return super().classify(faces)
+        out = []
+        for crop in crops or []:
+            res = DeepFace.analyze(crop, actions=["emotion"], enforce_detection=False)
+            if isinstance(res, list) and res:
+                res = res[0]
+            emo_dict = res.get("emotion", {}) or {}
+            scores = np.array([float(emo_dict.get(e, 0.0)) for e in EMOTIONS], dtype=np.float32)
+            out.append(to_result(scores))
+        return out
+
+
+class OnnxEmotion(EmotionClassifier):
+    """The emotion CNN exported to ONNX, run with onnxruntime on CPU.
+
+    Works for the float export and for int8 models made by
+    quantizeEmotion.py. NCHW models get the tensor transposed. Whether
+    the graph already ends in a softmax is read from the model (needs the
+    onnx package) unless `softmax_output` says so.
+    """
+    name = "onnx"
+    default_model = FLOAT_MODEL
+
+    def __init__(self, model: Optional[str] = None, threads: Optional[int] = None,
+                 softmax_output: Optional[bool] = None):
+        if not HAVE_ONNXRUNTIME:
+            raise RuntimeError("onnxruntime is not installed.")
+        self.model_path = model or self.default_model
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Emotion model not found: {self.model_path}")
+        if softmax_output is None:
+            softmax_output = ends_in_softmax(self.model_path)
+        self.softmax_output = softmax_output
+        opts = ort.SessionOptions()
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(self.model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.channels_first = len(inp.shape) == 4 and inp.shape[1] == 1
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(faces.transpose(0, 3, 1, 2)) if self.channels_first else faces
+        out = np.asarray(self.session.run(None, {self.input_name: x})[0], dtype=np.float32)
+        # Exports may drop the final softmax
+        if not self.softmax_output:
+            out = np.exp(out - out.max(axis=1, keepdims=True))
+            out /= out.sum(axis=1, keepdims=True)
+        return out * 100.0
+
+
+def ends_in_softmax(model_path: str) -> bool:
+    """True if the model's first output comes from a (possibly quantized) Softmax."""
+    if not HAVE_ONNX:
+        raise RuntimeError("onnx is not installed; it is needed to inspect the model's output "
+                           "(or pass softmax_output explicitly).")
+    graph = onnx.load(model_path, load_external_data=False).graph
+    producers = {out: node for node in graph.node for out in node.output}
+    name = graph.output[0].name
+    while name in producers:
+        node = producers[name]
+        if node.op_type in ("Softmax", "QLinearSoftmax"):
+            return True
+        if node.op_type not in _PASS_THROUGH_OPS or not node.input:
+            return False
+        name = node.input[0]
+    return False
+
+
+class OnnxInt8Emotion(OnnxEmotion):
+    name = "onnx-int8"
+    default_model = INT8_MODEL
+
+
+CLASSIFIERS = {
+    DeepFaceEmotion.name: DeepFaceEmotion,
+    OnnxEmotion.name: OnnxEmotion,
+    OnnxInt8Emotion.name: OnnxInt8Emotion,
+}
+
+
+def make_classifier(name: str = "deepface", **kwargs) -> EmotionClassifier:
+    try:
+        cls = CLASSIFIERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown emotion classifier '{name}'. Choose from: {', '.join(CLASSIFIERS)}")
+    return cls(**kwargs)
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import cv2
+
+Box = Tuple[int, int, int, int]
+
+YUNET_MODEL = "models/face_detection_yunet_2023mar.onnx"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def set_cv_threads(n: Optional[int]):
+    """Limit OpenCV's internal thread pool (None/negative keeps the default)."""
+    if n is not None and n >= 0:
+        cv2.setNumThreads(n)
+
+
+class FaceDetector(ABC):
+    """Common interface: detect(bgr, gray=None) -> list of (x, y, w, h)."""
+    name = "base"
+
+    @abstractmethod
+    def detect(self, bgr_img, gray=None) -> List[Box]:
+        ...
+
+
+class HaarFaceDetector(FaceDetector):
+    name = "haar"
+
+    def __init__(self, min_face: int = 60, scale_factor: float = 1.1, min_neighbors: int = 5):
+        self.min_face = min_face
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+
+    def detect(self, bgr_img, gray=None) -> List[Box]:
+        if gray is None:
+            gray = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+            minSize=(self.min_face, self.min_face)
+        )
+        return [tuple(int(v) for v in f) for f in faces]
+
+
+class YuNetFaceDetector(FaceDetector):
+    """OpenCV's CNN face detector (FaceDetectorYN) with a local ONNX model."""
+    name = "yunet"
+
+    def __init__(self, model: str = YUNET_MODEL, min_face: int = 60,
+                 score_threshold: float = 0.8, nms_threshold: float = 0.3, top_k: int = 50):
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise RuntimeError("This OpenCV build has no FaceDetectorYN (needs OpenCV >= 4.5.4).")
+        if not os.path.exists(model):
+            raise FileNotFoundError(f"YuNet model not found: {model}")
+        self.min_face = min_face
+        self._size = (320, 320)
+        self.net = cv2.FaceDetectorYN.create(model, "", self._size, score_threshold, nms_threshold, top_k)
+
+    def detect(self, bgr_img, gray=None) -> List[Box]:
+        h, w = bgr_img.shape[:2]
+        if (w, h) != self._size:
+            self._size = (w, h)
+            self.net.setInputSize(self._size)
+        _, faces = self.net.detect(bgr_img)
+        if faces is None:
+            return []
+        out = []
+        for f in faces:
+            x, y, fw, fh = (int(round(v)) for v in f[:4])
+            if fw < self.min_face or fh < self.min_face:
+                continue
+            x, y = max(0, x), max(0, y)
+            out.append((x, y, min(fw, w - x), min(fh, h - y)))
+        return out
+
+
+DETECTORS = {
+    HaarFaceDetector.name: HaarFaceDetector,
+    YuNetFaceDetector.name: YuNetFaceDetector,
+}
+
+
+def make_detector(name: str = "haar", **kwargs) -> FaceDetector:
+    try:
+        cls = DETECTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown face detector '{name}'. Choose from: {', '.join(DETECTORS)}")
+    return cls(**kwargs)
+
+
+# Benchmark
+def load_replay(source: str):
+    """Yield BGR frames from an image directory or a video file."""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTS):
+                img = cv2.imread(os.path.join(source, name))
+                if img is not None:
+                    yield img
+        return
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open replay source {source}")
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def benchmark(detector: FaceDetector, frames, warmup: int = 3) -> dict:
+    """Time detector.detect over every frame; warm-up runs repeat the first one."""
+    frames = list(frames)
+    for _ in range(warmup if frames else 0):
+        detector.detect(frames[0])
+    lat = []
+    hits = 0
+    faces_total = 0
+    for frame in frames:
+        t0 = time.perf_counter()
+        faces = detector.detect(frame)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+        hits += 1 if faces else 0
+        faces_total += len(faces)
+    n = len(lat)
+    if n == 0:
+        print(f"[Warn] No frames to benchmark {detector.name} on.", file=sys.stderr)
+    lat.sort()
+    return {
+        "detector": detector.name,
+        "frames": n,
+        "hit_rate": round(hits / n, 4) if n else 0.0,
+        "faces_per_frame": round(faces_total / n, 3) if n else 0.0,
+        "mean_ms": round(sum(lat) / n, 3) if n else 0.0,
+        "p50_ms": round(lat[n // 2], 3) if n else 0.0,
+        "p95_ms": round(lat[min(n - 1, int(n * 0.95))], 3) if n else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Compare face detectors on latency and hit rate over a replay set.")
+    p.add_argument("source", help="Directory of images or a video file containing faces")
+    p.add_argument("--detectors", default=",".join(DETECTORS), help="Comma-separated detector names")
+    p.add_argument("--threads", type=int, default=None, help="OpenCV thread count (default: OpenCV's choice)")
+    p.add_argument("--min-face", type=int, default=60)
+    p.add_argument("--yunet-model", default=YUNET_MODEL)
+    p.add_argument("--json", action="store_true", help="Print one JSON object per detector")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_cv_threads(args.threads)
+    frames = list(load_replay(args.source))
+    if not frames:
+        print(f"[Error] No frames in {args.source}")
+        sys.exit(1)
+
+    for name in args.detectors.split(","):
+        name = name.strip()
+        kwargs = {"min_face": args.min_face}
+        if name == YuNetFaceDetector.name:
+            kwargs["model"] = args.yunet_model
+        try:
+            det = make_detector(name, **kwargs)
+        except (ValueError, RuntimeError, FileNotFoundError) as e:
+            print(f"[Warn] Skipping {name}: {e}")
+            continue
+        res = benchmark(det, frames)
+        res["threads"] = cv2.getNumThreads()
+        if args.json:
+            print(json.dumps(res))
+        else:
+            print(f"{res['detector']:>6}: {res['frames']} frames, hit rate {res['hit_rate']:.1%}, "
+                  f"mean {res['mean_ms']:.1f} ms, p95 {res['p95_ms']:.1f} ms, threads {res['threads']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:     # Windows
+    fcntl = None
+    HAVE_FCNTL = False
+    import msvcrt
+
+class _PathState:
+    """What every FileLock on one path shares: the thread lock, the fd and the depth."""
+
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.fd = None
+        self.depth = 0
+
+
+_path_states = {}
+_path_states_guard = threading.Lock()
+
+
+def _path_state(path: str) -> _PathState:
+    with _path_states_guard:
+        return _path_states.setdefault(os.path.abspath(path), _PathState())
+
+
+class FileLock:
+    """Exclusive advisory lock on `path`, across threads and processes.
+
+    Threads in one process serialize on an in-process lock first, then the
+    holder takes an OS lock on the file (flock on POSIX, msvcrt.locking on
+    Windows) so other processes wait too. Re-entering from the holding
+    thread is allowed, through this or any other FileLock on the same path.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._state = _path_state(path)
+
+    def acquire(self):
+        st = self._state
+        if not st.rlock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out waiting for {self.path}")
+        st.depth += 1
+        if st.depth > 1:
+            return self
+        try:
+            st.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    if HAVE_FCNTL:
+                        fcntl.flock(st.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        msvcrt.locking(st.fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Timed out waiting for {self.path}")
+                    time.sleep(0.002)
+        except BaseException:
+            self._release_fd()
+            st.depth -= 1
+            st.rlock.release()
+            raise
+        return self
+
+    def release(self):
+        st = self._state
+        st.depth -= 1
+        if st.depth == 0:
+            if HAVE_FCNTL:
+                fcntl.flock(st.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(st.fd, 0, os.SEEK_SET)
+                msvcrt.locking(st.fd, msvcrt.LK_UNLCK, 1)
+            self._release_fd()
+        st.rlock.release()
+
+    def _release_fd(self):
+        st = self._state
+        if st.fd is not None:
+            os.close(st.fd)
+            st.fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,242 @@
+import multiprocessing as mp
+import queue
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """Fixed-size frame slots in one shared memory block.
+
+    Each slot is exposed as a numpy view, so producer and workers read and
+    write frames in place; only slot indices travel between processes.
+    """
+
+    def __init__(self, slots: int, shape: Tuple[int, ...], name: Optional[str] = None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        nbytes = int(np.prod(self.shape)) * slots
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        elif sys.version_info >= (3, 13):
+            # Only the creating process unlinks; keep attaching workers out of the tracker
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Spawned workers share the parent's resource tracker, where this
+            # block is already registered; unregistering here would drop the
+            # parent's entry, so leave it alone.
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __getitem__(self, slot: int) -> np.ndarray:
+        return self.frames[slot]
+
+    def close(self):
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass    # a caller still holds a slot view; freed when it goes away
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _worker_main(shm_name, slots, shape, tasks, results, detector_name, classifier_name, min_face, cv_threads):
+    # Imported here so the spawned process only loads what it needs
+    from faceDetectors import HaarFaceDetector, make_detector, set_cv_threads
+    from emotionModel import make_classifier
+    from preprocess import FramePreprocessor
+
+    def notify(message):
+        # Init problems travel on the results queue with no slot attached
+        results.put((None, -1, 0.0, [], [], message))
+
+    set_cv_threads(cv_threads)
+    try:
+        ring = SharedFrameRing(slots, shape, name=shm_name)
+    except Exception as e:
+        notify(f"Worker could not attach to the frame buffer: {e}")
+        raise
+    try:
+        detector = make_detector(detector_name, min_face=min_face)
+    except Exception as e:
+        notify(f"Face detector '{detector_name}' unavailable ({e}), using Haar.")
+        detector = HaarFaceDetector(min_face)
+    classifier = None
+    if classifier_name:
+        try:
+            classifier = make_classifier(classifier_name)
+        except Exception as e:
+            notify(f"Emotion model '{classifier_name}' unavailable: {e}")
+    pre = FramePreprocessor(max_faces=4, display_slots=1)
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, frame_idx, ts, analyze = task
+            frame = ring[slot]
+            emotions, error = [], None
+            try:
+                gray = pre.gray_image(frame)
+                faces = detector.detect(frame, gray=gray)
+                if analyze and classifier and faces:
+                    tensor = pre.face_tensors(faces)
+                    crops = [frame[y:y + h, x:x + w] for (x, y, w, h) in faces[:len(tensor)]]
+                    emotions = [(e, c) for e, c, _ in classifier.classify(tensor, crops=crops)]
+            except Exception as e:
+                faces, error = [], str(e)
+            results.put((slot, frame_idx, ts, faces, emotions, error))
+    finally:
+        frame = crops = None
+        ring.close()
+
+
+class ProcessPipeline:
+    """Detection and emotion inference in worker processes.
+
+    submit() claims a free slot, lets the caller fill it (or copies a frame
+    in) and queues a small (slot, frame_idx, ts, analyze) message to the
+    least busy worker. poll() returns finished results and frees their
+    slots. When every slot is in flight, submit() drops the frame instead
+    of blocking the UI process.
+
+    Worker start-up problems and worker deaths come back from poll() as
+    results with frame_idx -1 and the message in `error`; slots held by a
+    dead worker are reclaimed. `alive` is False once no worker is left.
+    """
+
+    def __init__(self, shape, workers: int = 2, slots: Optional[int] = None,
+                 detector: str = "haar", classifier: Optional[str] = "deepface",
+                 min_face: int = 60, cv_threads: int = 1):
+        self.shape = tuple(shape)
+        self.workers = workers
+        self.slots = slots or workers * 2
+        self.detector = detector
+        self.classifier = classifier
+        self.min_face = min_face
+        self.cv_threads = cv_threads
+        self.ring: Optional[SharedFrameRing] = None
+        self._procs: List[mp.Process] = []
+        self._tasks: List = []
+        self._inflight: List[Set[int]] = []
+        self._free = deque()
+        self._notices: Set[str] = set()
+        self.dropped = 0
+
+    def start(self):
+        # spawn: forking a process that already runs Qt is not safe
+        ctx = mp.get_context("spawn")
+        self.ring = SharedFrameRing(self.slots, self.shape)
+        self._results = ctx.Queue()
+        self._free = deque(range(self.slots))
+        for _ in range(self.workers):
+            # One task queue per worker, so a dead worker's slots are known
+            tasks = ctx.Queue()
+            p = ctx.Process(
+                target=_worker_main,
+                args=(self.ring.name, self.slots, self.shape, tasks, self._results,
+                      self.detector, self.classifier, self.min_face, self.cv_threads),
+                daemon=True,
+            )
+            p.start()
+            self._procs.append(p)
+            self._tasks.append(tasks)
+            self._inflight.append(set())
+        return self
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._procs)
+
+    def acquire(self) -> Optional[int]:
+        """Claim a free slot for the caller to write into, or None if all are busy."""
+        if not self._free:
+            self.dropped += 1
+            return None
+        return self._free.popleft()
+
+    def release(self, slot: int):
+        self._free.append(slot)
+
+    def submit_slot(self, slot: int, frame_idx: int, analyze: bool, ts: Optional[float] = None) -> bool:
+        if not self._procs:
+            self.release(slot)
+            return False
+        i = min(range(len(self._procs)), key=lambda k: len(self._inflight[k]))
+        self._inflight[i].add(slot)
+        self._tasks[i].put((slot, frame_idx, time.monotonic() if ts is None else ts, analyze))
+        return True
+
+    def submit(self, frame, frame_idx: int, analyze: bool) -> bool:
+        slot = self.acquire()
+        if slot is None:
+            return False
+        np.copyto(self.ring[slot], frame)
+        return self.submit_slot(slot, frame_idx, analyze)
+
+    def poll(self, timeout: float = 0.0):
+        """Finished results as (frame_idx, ts, faces, emotions, error), oldest first."""
+        out = []
+        block = timeout > 0
+        while True:
+            try:
+                slot, frame_idx, ts, faces, emotions, error = self._results.get(block, timeout)
+            except queue.Empty:
+                break
+            block = False
+            if slot is None:
+                self._notice(out, error)
+                continue
+            owner = next((held for held in self._inflight if slot in held), None)
+            if owner is not None:
+                # Otherwise _reap already took the slot back from a dead worker
+                owner.discard(slot)
+                self._free.append(slot)
+            out.append((frame_idx, ts, faces, emotions, error))
+        self._reap(out)
+        out.sort(key=lambda r: r[0])
+        return out
+
+    def _notice(self, out: list, message: str):
+        # Every worker reports the same start-up problem; pass it on once
+        if message not in self._notices:
+            self._notices.add(message)
+            out.append((-1, 0.0, [], [], message))
+
+    def _reap(self, out: list):
+        """Drop dead workers and give their in-flight slots back."""
+        for i in reversed(range(len(self._procs))):
+            p = self._procs[i]
+            if p.is_alive():
+                continue
+            self._free.extend(self._inflight[i])
+            self._notice(out, f"Worker process exited (code {p.exitcode}); {len(self._procs) - 1} left.")
+            del self._procs[i], self._tasks[i], self._inflight[i]
+
+    def close(self, timeout: float = 2.0):
+        for tasks in self._tasks:
+            tasks.put(None)
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        self._tasks = []
+        self._inflight = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -1,11 +1,25 @@
-import json, datetime, os
+import json, datetime, os, threading
+
+from fileLock import FileLock
 
 class LogEmotion:
-    def __init__(self, filename):
+    def __init__(self, filename, store=None):
+        # With a SegmentLog store, entries go to capped segment files and any
+        # existing single-file log is migrated into it once.
         self.filename = filename
+        self.store = store
+        # Guards the read-modify-write of the single-file log across writers
+        self.lock = FileLock(f"{filename}.lock") if filename and store is None else None
+        if store is not None and filename and os.path.exists(filename):
+            store.importLegacy(filename)
+        if store is not None:
+            # Pruning otherwise only happens on rotation
+            store.maintain()
     
 
-    def loadJSON(self):
+    def loadJSON(self, start=None, end=None):
+        if self.store is not None:
+            return self.store.read(start, end)
         try:
             with open(self.filename, "r", encoding = "utf-8") as f:
                 data = json.load(f)
@@ -16,7 +30,7 @@ class LogEmotion:
             return []
         
     def saveJSON(self, data):
-        tmp = f"{self.filename}.tmp"
+        tmp = f"{self.filename}.{os.getpid()}.{threading.get_ident()}.tmp"
         with open(tmp, "w", encoding = "utf-8") as f:
             json.dump(data, f, indent = 4, ensure_ascii=False)
         os.replace(tmp, self.filename)
@@ -28,9 +42,12 @@ class LogEmotion:
             "emotion": emotion,
             "percentage": percentage
         }
-        data = self.loadJSON()
-        data.append(entry)
-        self.saveJSON(data)
+        if self.store is not None:
+            return self.store.append(entry)
+        with self.lock:
+            data = self.loadJSON()
+            data.append(entry)
+            self.saveJSON(data)
         return entry
             
 
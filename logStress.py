@@ -0,0 +1,109 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from logEmotion import LogEmotion
+from segmentLog import SegmentLog
+
+EMOTIONS = ["happy", "sad", "neutral", "angry", "surprise"]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Hammer the emotion log from many processes and threads, then count lost records.")
+    p.add_argument("--processes", type=int, default=4)
+    p.add_argument("--threads", type=int, default=2, help="Writer threads per process")
+    p.add_argument("--entries", type=int, default=250, help="Entries per writer thread")
+    p.add_argument("--mode", choices=["segments", "single"], default="segments",
+                   help="segments: SegmentLog store; single: legacy stats.json file")
+    p.add_argument("--max-bytes", type=int, default=16 * 1024, help="Segment size cap (small to force rotation)")
+    p.add_argument("--dir", default=None, help="Working directory (default: a temp dir, removed afterwards)")
+    return p.parse_args(argv)
+
+
+def _make_logger(mode: str, root: str, max_bytes: int) -> LogEmotion:
+    if mode == "single":
+        return LogEmotion(os.path.join(root, "stats.json"))
+    # compaction off so every raw entry stays countable
+    store = SegmentLog(os.path.join(root, "stats"), max_bytes=max_bytes, compact_after=float("inf"), retention=float("inf"))
+    return LogEmotion(None, store=store)
+
+
+def _writer_process(proc: int, threads: int, entries: int, mode: str, root: str, max_bytes: int, start_evt):
+    logger = _make_logger(mode, root, max_bytes)
+    errors = []
+
+    def write(t):
+        for i in range(entries):
+            try:
+                logger.appendJSON(f"{proc}:{t}:{i}", EMOTIONS[i % len(EMOTIONS)], i % 101)
+            except Exception as e:
+                errors.append(repr(e))
+
+    start_evt.wait()
+    workers = [threading.Thread(target=write, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    if errors:
+        print(f"[Warn] process {proc}: {len(errors)} write errors, first: {errors[0]}")
+
+
+def run(args) -> dict:
+    root = args.dir or tempfile.mkdtemp(prefix="logstress-")
+    os.makedirs(root, exist_ok=True)
+    try:
+        ctx = mp.get_context("spawn")
+        start_evt = ctx.Event()
+        procs = [
+            ctx.Process(target=_writer_process,
+                        args=(p, args.threads, args.entries, args.mode, root, args.max_bytes, start_evt))
+            for p in range(args.processes)
+        ]
+        for p in procs:
+            p.start()
+        t0 = time.perf_counter()
+        start_evt.set()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        rows = _make_logger(args.mode, root, args.max_bytes).loadJSON()
+        names = [r.get("name") for r in rows]
+        unique = set(names)
+        expected = {f"{p}:{t}:{i}" for p in range(args.processes) for t in range(args.threads) for i in range(args.entries)}
+        segments = None
+        if args.mode == "segments":
+            m = SegmentLog(os.path.join(root, "stats")).loadManifest()
+            segments = len(m["segments"]) + (1 if m.get("active") else 0)
+        return {
+            "mode": args.mode,
+            "processes": args.processes,
+            "threads": args.threads,
+            "expected": len(expected),
+            "found": len(unique & expected),
+            "lost": len(expected - unique),
+            "duplicates": len(names) - len(unique),
+            "seconds": round(elapsed, 3),
+            "entries_per_sec": round(len(expected) / elapsed, 1) if elapsed else 0.0,
+            "segments": segments,
+            "exit_codes": [p.exitcode for p in procs],
+        }
+    finally:
+        if args.dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    res = run(parse_args(argv))
+    print(json.dumps(res))
+    if res["lost"] or res["duplicates"] or any(res["exit_codes"]):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QStackedWidget
 from page_one import PageOne
 from page_two import PageTwo
 from page_three import PageThree
+import memoryProfile
 
 APP_STYLES = """
 * { font-family: Inter, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif; }
@@ -72,5 +73,7 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyleSheet(APP_STYLES)
     win = MainWindow()
+    # MARINA_MEMORY_PROFILE=memory.jsonl python main.py  -> samples memory every minute
+    monitor = memoryProfile.install(win)
     win.showMaximized()
     sys.exit(app.exec())
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+try:
+    import psutil
+    HAVE_PSUTIL = True
+except Exception:
+    psutil = None
+    HAVE_PSUTIL = False
+
+MEMORY_ENV = "MARINA_MEMORY_PROFILE"   # set to an output path to enable in main.py
+
+
+def _windows_rss() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.WinDLL("kernel32")
+    psapi = ctypes.WinDLL("psapi")
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise OSError("GetProcessMemoryInfo failed")
+    return counters.WorkingSetSize
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (0 if it cannot be read)."""
+    if HAVE_PSUTIL:
+        return psutil.Process().memory_info().rss
+    try:
+        if sys.platform == "win32":
+            return _windows_rss()
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource     # peak, not current, but better than nothing
+    except ImportError:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def qt_object_counts(roots: Dict[str, object]) -> Dict[str, int]:
+    """Live QObject descendants per page, e.g. leaked animations."""
+    from PySide6 import QtCore
+    counts = {}
+    for name, root in roots.items():
+        try:
+            children = root.findChildren(QtCore.QObject)
+        except RuntimeError:    # C++ object already deleted
+            continue
+        counts[name] = len(children)
+        for child in children:
+            kind = f"{name}.{type(child).__name__}"
+            counts[kind] = counts.get(kind, 0) + 1
+    return counts
+
+
+class MemoryMonitor:
+    """Samples RSS, the Python heap and Qt object counts into a JSON-lines file.
+
+    Each sample records RSS, tracemalloc current/peak, the top allocation
+    sites and, when `qt_roots` is given, live QObject counts under each
+    page. Call sample() from a timer; the first call starts tracemalloc.
+    """
+
+    def __init__(self, path: str = "memory.jsonl", top: int = 10, qt_roots: Optional[Dict[str, object]] = None,
+                 frames: int = 1):
+        self.path = path
+        self.top = top
+        self.qt_roots = qt_roots or {}
+        self.frames = frames
+        self.started = time.time()
+        self.samples = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def sample(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        top = [
+            {"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "kb": round(s.size / 1024, 1), "count": s.count}
+            for s in snap.statistics("lineno")[:self.top]
+        ]
+        row = {
+            "t": round(time.time() - self.started, 1),
+            "rss_mb": round(rss_bytes() / 2**20, 2),
+            "py_current_mb": round(current / 2**20, 2),
+            "py_peak_mb": round(peak / 2**20, 2),
+            "qt": qt_object_counts(self.qt_roots) if self.qt_roots else {},
+            "top": top,
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+        self.samples += 1
+        return row
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def install(window, path: Optional[str] = None, interval_s: float = 60.0) -> Optional[MemoryMonitor]:
+    """Attach a sampling timer to the main window if profiling is enabled."""
+    path = path or os.environ.get(MEMORY_ENV)
+    if not path:
+        return None
+    from PySide6 import QtCore
+
+    roots = {type(p).__name__: p for p in (window.page1, window.page2, window.page3)}
+    monitor = MemoryMonitor(path, qt_roots=roots)
+    timer = QtCore.QTimer(window)
+    timer.timeout.connect(monitor.sample)
+    timer.start(int(interval_s * 1000))
+    monitor.timer = timer
+    monitor.sample()
+    return monitor
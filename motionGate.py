@@ -0,0 +1,119 @@
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap change detector in front of face detection.
+
+    Each frame is shrunk to a thumbnail and differenced against the last
+    one. check() says whether the frame is worth running detection on: yes
+    on motion, on a periodic re-check while a face is in view, and never
+    for a static, empty scene. After `idle_after` seconds without motion
+    or faces the gate goes idle, which callers use to lower the frame rate;
+    the first changed frame wakes it.
+
+    Also keeps CPU use per state (process CPU time over wall time) and wake
+    latency: the time from the last idle sample before the motion to the
+    moment processing resumes, i.e. the worst case for motion that started
+    just after that sample.
+    """
+
+    def __init__(self, size=(80, 60), pixel_threshold: int = 18, min_changed: float = 0.01,
+                 idle_after: float = 10.0, recheck: float = 1.0):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.idle_after = idle_after
+        self.recheck = recheck
+        w, h = size
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        self._prev = np.empty((h, w), dtype=np.uint8)
+        self._diff = np.empty((h, w), dtype=np.uint8)
+        self._primed = False
+
+        now = time.monotonic()
+        self.idle = False
+        self.faces_present = False
+        self.last_activity = now
+        self.last_processed = 0.0
+        self._last_ts = now
+        self.processed = 0
+        self.skipped = 0
+        self.wakes = 0
+        self.wake_ms_last = 0.0
+        self._wake_ms_total = 0.0
+        self._cpu = {"active": 0.0, "idle": 0.0}
+        self._wall = {"active": 0.0, "idle": 0.0}
+        self._mark = (now, time.process_time())
+
+    def changed_fraction(self, frame) -> float:
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if not self._primed:
+            self._prev[...] = self._gray
+            self._primed = True
+            return 1.0
+        cv2.absdiff(self._gray, self._prev, dst=self._diff)
+        self._prev, self._gray = self._gray, self._prev
+        cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        return cv2.countNonZero(self._diff) / self._diff.size
+
+    def check(self, frame, ts: Optional[float] = None) -> bool:
+        """True if detection should run on this frame."""
+        now = time.monotonic()
+        ts = now if ts is None else ts
+        self._account(now)
+
+        motion = self.changed_fraction(frame) >= self.min_changed
+        due = self.faces_present and now - self.last_processed >= self.recheck
+        if motion:
+            self.last_activity = now
+            if self.idle:
+                self.idle = False
+                self.wakes += 1
+                self.wake_ms_last = (now - self._last_ts) * 1000.0
+                self._wake_ms_total += self.wake_ms_last
+        elif not self.idle and now - self.last_activity >= self.idle_after:
+            self.idle = True
+        self._last_ts = ts
+
+        if motion or due:
+            self.last_processed = now
+            self.processed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def saw_faces(self, present: bool):
+        """Report the detection result for the frame check() let through."""
+        self.faces_present = present
+        if present:
+            self.last_activity = time.monotonic()
+            self.idle = False
+
+    def _account(self, now: float):
+        then, cpu_then = self._mark
+        cpu_now = time.process_time()
+        state = "idle" if self.idle else "active"
+        self._wall[state] += now - then
+        self._cpu[state] += cpu_now - cpu_then
+        self._mark = (now, cpu_now)
+
+    def stats(self) -> dict:
+        def pct(state):
+            return round(100.0 * self._cpu[state] / self._wall[state], 1) if self._wall[state] else 0.0
+        return {
+            "state": "idle" if self.idle else "active",
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "idle_cpu_pct": pct("idle"),
+            "active_cpu_pct": pct("active"),
+            "idle_seconds": round(self._wall["idle"], 1),
+            "wakes": self.wakes,
+            "wake_ms_last": round(self.wake_ms_last, 1),
+            "wake_ms_mean": round(self._wake_ms_total / self.wakes, 1) if self.wakes else 0.0,
+        }
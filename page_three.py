@@ -1,33 +1,48 @@
+import threading
 from typing import List, Tuple, Optional
 from PySide6 import QtCore, QtGui, QtWidgets
 from affirmations import pick_affirmation
 
 import cv2
 
-# optional deepface (kept graceful if it's missing)
-try:
-    from deepface import DeepFace
-    HAVE_DEEPFACE = True
-except Exception:
-    DeepFace = None
-    HAVE_DEEPFACE = False
-
+from emotionModel import HAVE_DEEPFACE, make_classifier
+from captureStream import LatestFrameCapture, LatencyStats, VideoFileSource
+from faceDetectors import FaceDetector, HaarFaceDetector, make_detector, set_cv_threads
 from logEmotion import LogEmotion
+from motionGate import MotionGate
+from segmentLog import SegmentLog
+from emotionBuffer import EmotionRingBuffer
+from framePipeline import ProcessPipeline
+from preprocess import FramePreprocessor
+from sparkline import Sparkline
 
 ANALYZE_EVERY = 5  
 MIN_FACE = 60  
 CAM_INDEX = 0    
-
-FACE_CASCADE = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
-def detect_faces(bgr_img) -> List[Tuple[int, int, int, int]]:
-    gray = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2GRAY)
-    faces = FACE_CASCADE.detectMultiScale(
-        gray, scaleFactor=1.1, minNeighbors=5, minSize=(MIN_FACE, MIN_FACE)
-    )
-    return list(faces)
+CAP_WIDTH = 640         # requested from the driver; None keeps its default
+CAP_HEIGHT = 480
+CAP_FPS = 30
+CAP_FOURCC = "MJPG"
+LOG_DIR = "stats"       # segmented log store (see segmentLog.py)
+HISTORY_SIZE = 4096     # samples kept in memory for live trends
+TREND_WINDOW = 5 * 60   # seconds shown by the sparkline
+TREND_BINS = 60
+DISPLAY_SLOTS = 3       # reused RGB buffers handed to the GUI thread
+TREND_REFRESH_MS = 2000 # redraw the trend even when nothing new is classified
+DETECTOR = "haar"       # "haar" or "yunet" (see faceDetectors.py)
+CV_THREADS = None       # OpenCV thread count, None keeps OpenCV's default
+CLASSIFIER = "deepface" # emotion model (see emotionModel.py)
+USE_PROCESSES = False   # run detection/inference in worker processes (framePipeline.py)
+PROCESS_WORKERS = 2
+MOTION_GATE = True      # skip detection on static scenes (motionGate.py)
+IDLE_AFTER = 10         # seconds without motion/faces before stepping down
+IDLE_FPS = 2
+
+set_cv_threads(CV_THREADS)
+FACE_DETECTOR = HaarFaceDetector(min_face=MIN_FACE)
+
+def detect_faces(bgr_img, detector: Optional[FaceDetector] = None, gray=None) -> List[Tuple[int, int, int, int]]:
+    return (detector or FACE_DETECTOR).detect(bgr_img, gray=gray)
 
 def draw_label(frame, x, y, w, h, label: Optional[str], score: Optional[int]):
     cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
@@ -37,71 +52,200 @@ def draw_label(frame, x, y, w, h, label: Optional[str], score: Optional[int]):
         cv2.putText(frame, txt, (x, y_text), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
 class CameraWorker(QtCore.QThread):
-    frameReady = QtCore.Signal(QtGui.QImage)         # emits the painted frame
+    frameReady = QtCore.Signal(QtGui.QImage, float)  # painted frame, capture time (monotonic)
     status     = QtCore.Signal(str)                  # status text
     lastEmotion = QtCore.Signal(str, int)            # (emotion, confidence%)
 
-    def __init__(self, name: str = "Guest", logfile: str = "stats.json", parent=None):
+    def __init__(self, name: str = "Guest", logfile: str = "stats.json",
+                 history: Optional[EmotionRingBuffer] = None, logdir: Optional[str] = LOG_DIR,
+                 detector: str = DETECTOR, classifier: str = CLASSIFIER,
+                 use_processes: bool = USE_PROCESSES, source=None, loop: bool = False, parent=None):
         super().__init__(parent)
         self._running = False
         self.name = name or "Guest"
-        self.logger = LogEmotion(logfile) if logfile else None
+        self.detectorName = detector
+        self.classifierName = classifier
+        self.useProcesses = use_processes
+        self.source = CAM_INDEX if source is None else source   # camera index or video path
+        self.loop = loop                                        # replay a video path until stopped
+        self.capture = None     # LatestFrameCapture for cameras, VideoFileSource for files
+        # Frames emitted but not yet copied by the GUI; one slot stays free for writing
+        self._displaySlots = threading.Semaphore(DISPLAY_SLOTS - 1)
+        self.gate = MotionGate(idle_after=IDLE_AFTER) if MOTION_GATE else None
+        store = SegmentLog(logdir) if logdir else None
+        self.logger = LogEmotion(logfile, store=store) if (logfile or store) else None
+        self.history = history
 
     def stop(self):
         self._running = False
 
     def run(self):
         self._running = True
-        cap = cv2.VideoCapture(CAM_INDEX)
+        if isinstance(self.source, str):
+            # Files play at their own frame rate, every frame, like a live camera
+            cap = VideoFileSource(self.source, loop=self.loop, pace=True)
+        else:
+            cap = LatestFrameCapture(self.source, width=CAP_WIDTH, height=CAP_HEIGHT, fps=CAP_FPS, fourcc=CAP_FOURCC)
         if not cap.isOpened():
-            self.status.emit("Could not open webcam. Check camera index/permissions.")
+            if isinstance(self.source, str):
+                self.status.emit(f"Could not open video file {self.source}.")
+            else:
+                self.status.emit("Could not open webcam. Check camera index/permissions.")
+            cap.release()
             return
 
-        self.status.emit("Camera started.")
+        self.capture = cap.start()
+        mode = cap.negotiated()
+        self.status.emit(f"Camera started ({mode['width']}x{mode['height']} @ {mode['fps']:.0f} fps {mode['fourcc']}).")
+        try:
+            if self.useProcesses:
+                self._run_processes(cap)
+            else:
+                self._run_thread(cap)
+        finally:
+            cap.release()
+            self.status.emit("Camera stopped.")
+
+    def _run_thread(self, cap):
+        try:
+            detector = make_detector(self.detectorName, min_face=MIN_FACE)
+        except Exception as e:
+            self.status.emit(f"Face detector '{self.detectorName}' unavailable ({e}), using Haar.")
+            detector = FACE_DETECTOR
+
+        classifier = None
+        if self._classifier_wanted():
+            try:
+                classifier = make_classifier(self.classifierName)
+            except Exception as e:
+                self.status.emit(f"Emotion model '{self.classifierName}' unavailable: {e}")
+
+        pre = FramePreprocessor(max_faces=1, display_slots=DISPLAY_SLOTS)
+        gate = self.gate
+        faces = []
         frame_idx = 0
+        while self._running:
+            ok, frame = cap.read()
+            if not ok:
+                self.status.emit("Camera read failed.")
+                break
+
+            if gate and not gate.check(frame, cap.frame_ts):
+                # Static scene: the last boxes still hold
+                for (x, y, w, h) in faces:
+                    draw_label(frame, x, y, w, h, None, None)
+                self._emit_frame(pre, frame, cap.frame_ts)
+                cap.max_fps = IDLE_FPS if gate.idle else None
+                continue
+
+            gray = pre.gray_image(frame)
+            faces = detect_faces(frame, detector, gray=gray)
+            if gate:
+                gate.saw_faces(bool(faces))
+                cap.max_fps = IDLE_FPS if gate.idle else None
+
+            if classifier and faces and (frame_idx % ANALYZE_EVERY == 0):
+                (x, y, w, h) = faces[0]
+                try:
+                    tensor = pre.face_tensors(faces[:1])
+                    results = classifier.classify(tensor, crops=[frame[y:y + h, x:x + w]])
+                    emo, conf, _ = results[0] if results else ("", 0, None)
+
+                    # draw & log
+                    draw_label(frame, x, y, w, h, emo, conf)
+                    self._report(emo, conf)
+                except Exception as e:
+                    self.status.emit(f"Emotion model error: {e}")
+            else:
+                # Draw boxes if not analyzing this frame
+                for (x, y, w, h) in faces:
+                    draw_label(frame, x, y, w, h, None, None)
+
+            self._emit_frame(pre, frame, cap.frame_ts)
+            frame_idx += 1
+
+    def _run_processes(self, cap):
+        ok, frame = cap.read()
+        if not ok:
+            self.status.emit("Camera read failed.")
+            return
+        pipeline = ProcessPipeline(
+            frame.shape, workers=PROCESS_WORKERS, detector=self.detectorName,
+            classifier=self.classifierName if self._classifier_wanted() else None, min_face=MIN_FACE,
+        ).start()
+
+        pre = FramePreprocessor(max_faces=1, display_slots=DISPLAY_SLOTS)
+        faces, label = [], (None, None)
+        frame_idx = 0
+        applied = -1    # newest frame whose boxes are shown; workers finish out of order
         try:
             while self._running:
+                gate = self.gate
+                if gate is None or gate.check(frame, cap.frame_ts):
+                    pipeline.submit(frame, frame_idx, analyze=(frame_idx % ANALYZE_EVERY == 0))
+
+                # Boxes trail the live frame by the pipeline latency
+                for idx, _, res_faces, emotions, error in pipeline.poll():
+                    if idx < 0:
+                        self.status.emit(error)     # worker start-up or exit notice
+                        continue
+                    if error:
+                        self.status.emit(f"Worker error: {error}")
+                        continue
+                    if idx > applied:
+                        # An older frame (e.g. a slow analyze) must not move the boxes back
+                        applied = idx
+                        faces = res_faces
+                        if gate:
+                            gate.saw_faces(bool(faces))
+                        if not faces:
+                            label = (None, None)
+                    if emotions:
+                        label = emotions[0]
+                        self._report(*label)
+
+                for i, (x, y, w, h) in enumerate(faces):
+                    draw_label(frame, x, y, w, h, *(label if i == 0 else (None, None)))
+                self._emit_frame(pre, frame, cap.frame_ts)
+                if gate:
+                    cap.max_fps = IDLE_FPS if gate.idle else None
+                frame_idx += 1
+
+                if not pipeline.alive:
+                    self.status.emit("All worker processes exited; camera stopped.")
+                    break
+
                 ok, frame = cap.read()
                 if not ok:
                     self.status.emit("Camera read failed.")
                     break
-
-                faces = detect_faces(frame)
-
-                if HAVE_DEEPFACE and faces and (frame_idx % ANALYZE_EVERY == 0):
-                    (x, y, w, h) = faces[0]
-                    crop = frame[y:y + h, x:x + w]
-                    try:
-                        res = DeepFace.analyze(crop, actions=["emotion"], enforce_detection=False)
-                        if isinstance(res, list) and res:
-                            res = res[0]
-                        emo = (res.get("dominant_emotion") or "").lower()
-                        emo_dict = res.get("emotion", {})
-                        conf = int(round(max(emo_dict.values()))) if emo_dict else 0
-
-                        # draw & log
-                        draw_label(frame, x, y, w, h, emo, conf)
-                        if self.logger and emo:
-                            self.logger.appendJSON(self.name, emo, conf)
-
-                        self.lastEmotion.emit(emo, conf)
-                    except Exception as e:
-                        self.status.emit(f"DeepFace error: {e}")
-                else:
-                    # Draw boxes if not analyzing this frame
-                    for (x, y, w, h) in faces:
-                        draw_label(frame, x, y, w, h, None, None)
-
-                # Convert BGR into RGB then into QImage
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
-                self.frameReady.emit(qimg)
-
-                frame_idx += 1
         finally:
-            cap.release()
-            self.status.emit("Camera stopped.")
+            pipeline.close()
+
+    def _classifier_wanted(self) -> bool:
+        return HAVE_DEEPFACE or self.classifierName != "deepface"
+
+    def _report(self, emo: str, conf: int):
+        if self.logger and emo:
+            self.logger.appendJSON(self.name, emo, conf)
+        if self.history is not None and emo:
+            self.history.append(emo, conf, face_id=0)
+        self.lastEmotion.emit(emo, conf)
+
+    def frame_done(self):
+        """Called by the GUI once it has copied an emitted frame."""
+        self._displaySlots.release()
+
+    def _emit_frame(self, pre: FramePreprocessor, frame, ts: float):
+        # The QImage wraps a reused buffer; if the GUI still holds every
+        # other slot, skip this frame rather than overwrite one it is painting
+        if not self._displaySlots.acquire(blocking=False):
+            return
+        # Convert BGR into RGB (reused buffer) then into QImage
+        rgb = pre.display_image(frame)
+        h, w, ch = rgb.shape
+        qimg = QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
+        self.frameReady.emit(qimg, ts)
 
 class PageThree(QtWidgets.QWidget):
     def __init__(self, stacked_widget: QtWidgets.QStackedWidget):
@@ -109,6 +253,9 @@ class PageThree(QtWidgets.QWidget):
         self._lastEmo = None
         self.stacked_widget = stacked_widget
         self.worker: Optional[CameraWorker] = None
+        self.history = EmotionRingBuffer(HISTORY_SIZE)
+        self.latency = LatencyStats()
+        self._frames = 0
 
         root = QtWidgets.QVBoxLayout(self)
         root.setContentsMargins(16, 16, 16, 16)
@@ -166,21 +313,43 @@ class PageThree(QtWidgets.QWidget):
                 """)
         root.addWidget(self.affirmLabel)
 
+        # Live trend of the current emotion
+        self.trendLabel = QtWidgets.QLabel("")
+        self.trendLabel.setAlignment(QtCore.Qt.AlignCenter)
+        self.trendLabel.setStyleSheet("font-size: 13px; color: #9aa3c1;")
+        root.addWidget(self.trendLabel)
+        self.sparkline = Sparkline()
+        self.sparkline.setFixedSize(640, 48)
+        root.addWidget(self.sparkline, alignment=QtCore.Qt.AlignCenter)
+
         # Status line
         self.statusLine = QtWidgets.QLabel("")
         self.statusLine.setAlignment(QtCore.Qt.AlignCenter)
         root.addWidget(self.statusLine)
 
+        # Capture-to-display latency
+        self.metricsLabel = QtWidgets.QLabel("")
+        self.metricsLabel.setAlignment(QtCore.Qt.AlignCenter)
+        self.metricsLabel.setStyleSheet("font-size: 12px; color: #6f7a9e;")
+        root.addWidget(self.metricsLabel)
+
         # Signals
-        self.startBtn.clicked.connect(self.start_camera)
+        self.startBtn.clicked.connect(lambda: self.start_camera())
         self.stopBtn.clicked.connect(self.stop_camera)
         self.backBtn.clicked.connect(self.go_back)
 
-    def start_camera(self):
+        # The window slides with time, so redraw without waiting for a new sample
+        self.trendTimer = QtCore.QTimer(self)
+        self.trendTimer.timeout.connect(self.update_trend)
+        self.trendTimer.start(TREND_REFRESH_MS)
+
+    def start_camera(self, source=None, loop: bool = False):
         if self.worker and self.worker.isRunning():
             return
         name = (self.nameEdit.text() or "Guest").strip()
-        self.worker = CameraWorker(name=name, logfile="stats.json", parent=self)
+        self.worker = CameraWorker(name=name, logfile="stats.json", history=self.history,
+                                   source=source, loop=loop, parent=self)
+        self.worker.finished.connect(self.on_worker_finished)
         self.worker.frameReady.connect(self.on_frame)
         self.worker.status.connect(self.statusLine.setText)
         self.worker.lastEmotion.connect(self.on_emotion)
@@ -194,15 +363,42 @@ class PageThree(QtWidgets.QWidget):
             self.worker.wait(1500)
             self.worker = None
 
+    @QtCore.Slot()
+    def on_worker_finished(self):
+        # Workers are parented to the page, so they would otherwise live until the app exits
+        worker = self.sender()
+        if worker is self.worker:
+            self.worker = None
+        if worker is not None:
+            worker.deleteLater()
+
     def go_back(self):
         self.stop_camera()
         self.stacked_widget.setCurrentIndex(0)
 
     # Slots
-    @QtCore.Slot(QtGui.QImage)
-    def on_frame(self, qimg: QtGui.QImage):
-        pix = QtGui.QPixmap.fromImage(qimg)
+    @QtCore.Slot(QtGui.QImage, float)
+    def on_frame(self, qimg: QtGui.QImage, ts: float):
+        pix = QtGui.QPixmap.fromImage(qimg)     # deep copy; the worker may reuse the buffer now
+        worker = self.sender()
+        if isinstance(worker, CameraWorker):
+            worker.frame_done()
         self.videoLabel.setPixmap(pix.scaled(640, 480, QtCore.Qt.KeepAspectRatioByExpanding, QtCore.Qt.SmoothTransformation))
+        self.latency.add_since(ts)
+        self._frames += 1
+        if self._frames % 30 == 0:
+            self.update_metrics()
+
+    def update_metrics(self):
+        m = self.latency.summary()
+        dropped = self.worker.capture.dropped if self.worker and self.worker.capture else 0
+        text = f"Capture→display latency: p50 {m['p50_ms']:.0f} ms, p95 {m['p95_ms']:.0f} ms · skipped frames {dropped}"
+        gate = self.worker.gate if self.worker else None
+        if gate:
+            g = gate.stats()
+            text += (f" · {g['state']}, CPU idle {g['idle_cpu_pct']:.0f}% / active {g['active_cpu_pct']:.0f}%,"
+                     f" wake {g['wake_ms_last']:.0f} ms")
+        self.metricsLabel.setText(text)
 
 
     @QtCore.Slot(str, int)
@@ -211,4 +407,12 @@ class PageThree(QtWidgets.QWidget):
         if emo and emo != self._lastEmo:
             self.affirmLabel.setText(pick_affirmation(emo))
             self._lastEmo = emo
+        self.update_trend()
+
+    def update_trend(self):
+        if not self._lastEmo:
+            return
+        share = self.history.shares(TREND_WINDOW).get(self._lastEmo, 0.0)
+        self.trendLabel.setText(f"{self._lastEmo}: {round(share * 100)}% of the last {TREND_WINDOW // 60} min")
+        self.sparkline.setValues(self.history.series(TREND_WINDOW, TREND_BINS, emotion=self._lastEmo))
 
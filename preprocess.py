@@ -0,0 +1,116 @@
+import tracemalloc
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+FACE_SIZE = 48      # DeepFace's emotion model input (48x48 grayscale)
+
+
+class FramePreprocessor:
+    """Per-frame preprocessing into reused buffers.
+
+    Produces the gray detection image, the RGB display image and
+    model-ready face tensors (N, 48, 48, 1) float32 in [0, 1], all written
+    into arrays allocated once per frame size. Display images rotate
+    through `display_slots` buffers so the GUI can still be painting the
+    previous frame while the next one is written.
+    """
+
+    def __init__(self, max_faces: int = 4, face_size: int = FACE_SIZE, display_slots: int = 3):
+        self.max_faces = max_faces
+        self.face_size = face_size
+        self.display_slots = display_slots
+        self._shape = None
+        self._gray = None
+        self._rgb: List[np.ndarray] = []
+        self._slot = 0
+        self._face_u8 = np.empty((max_faces, face_size, face_size), dtype=np.uint8)
+        self._tensor = np.empty((max_faces, face_size, face_size, 1), dtype=np.float32)
+        self._scale = np.float32(1.0 / 255.0)
+
+    def _ensure(self, frame):
+        if frame.shape != self._shape:
+            h, w = frame.shape[:2]
+            self._shape = frame.shape
+            self._gray = np.empty((h, w), dtype=np.uint8)
+            self._rgb = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(self.display_slots)]
+            self._slot = 0
+
+    def gray_image(self, frame) -> np.ndarray:
+        self._ensure(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def face_tensors(self, faces: Sequence[Tuple[int, int, int, int]]) -> np.ndarray:
+        """Crop, resize and normalize faces from the last gray image.
+
+        Returns a view of the first len(faces) rows of the tensor buffer; it
+        is overwritten by the next call.
+        """
+        n = min(len(faces), self.max_faces)
+        size = (self.face_size, self.face_size)
+        for i in range(n):
+            x, y, w, h = faces[i]
+            cv2.resize(self._gray[y:y + h, x:x + w], size, dst=self._face_u8[i], interpolation=cv2.INTER_AREA)
+        # Cast in place, then scale in place: a mixed-dtype ufunc with out=
+        # allocates a cast buffer on every call
+        view = self._tensor[:n, :, :, 0]
+        np.copyto(view, self._face_u8[:n], casting="unsafe")
+        np.multiply(view, self._scale, out=view)
+        return self._tensor[:n]
+
+    def display_image(self, frame) -> np.ndarray:
+        self._ensure(frame)
+        rgb = self._rgb[self._slot]
+        self._slot = (self._slot + 1) % self.display_slots
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
+
+    def process(self, frame, faces):
+        """Run all three stages; faces are the detections on this frame."""
+        gray = self.gray_image(frame)
+        tensor = self.face_tensors(faces)
+        return gray, self.display_image(frame), tensor
+
+
+def measure_allocations(pre: FramePreprocessor, frame, faces, frames: int = 100, warmup: int = 3) -> int:
+    """Peak bytes allocated above the warmed-up baseline over `frames` frames.
+
+    Any per-frame image allocation shows up here at full size, since the
+    peak is taken over every frame (via tracemalloc).
+    """
+    for _ in range(warmup):
+        pre.process(frame, faces)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(frames):
+            pre.process(frame, faces)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return peak - base
+
+
+def check():
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    faces = [(100, 80, 160, 160), (400, 200, 120, 120)]
+    pre = FramePreprocessor(max_faces=2)
+    gray, rgb, tensor = pre.process(frame, faces)
+    assert gray.shape == (480, 640) and rgb.shape == (480, 640, 3)
+    assert tensor.shape == (2, FACE_SIZE, FACE_SIZE, 1) and tensor.dtype == np.float32
+    assert 0.0 <= float(tensor.min()) and float(tensor.max()) <= 1.0
+
+    per_frame = measure_allocations(pre, frame, faces)
+    # A single gray 640x480 image is 300 KiB; only small Python objects
+    # (array views, tuples) may be created per frame.
+    assert per_frame < 4096, f"{per_frame} bytes allocated per frame"
+    print(f"OK: {per_frame} bytes peak allocation per frame")
+
+if __name__ == "__main__":
+    check()
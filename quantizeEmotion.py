@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from emotionBuffer import EMOTIONS
+from emotionModel import FLOAT_MODEL, INT8_MODEL, OnnxEmotion
+from faceDetectors import make_detector
+from preprocess import FramePreprocessor
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# Dataset
+def load_labeled(root: str, detect: bool, limit: int = 0) -> Tuple[np.ndarray, List[int]]:
+    """Face tensors and label indices from root/<emotion>/*.jpg.
+
+    With `detect`, the largest Haar face in each image is used; otherwise
+    every image is treated as a face crop already.
+    """
+    detector = make_detector("haar", min_face=24) if detect else None
+    pre = FramePreprocessor(max_faces=1, display_slots=1)
+    tensors, labels = [], []
+    for label in sorted(os.listdir(root)):
+        if label not in EMOTIONS or not os.path.isdir(os.path.join(root, label)):
+            continue
+        names = sorted(n for n in os.listdir(os.path.join(root, label)) if n.lower().endswith(IMAGE_EXTS))
+        if limit:
+            names = names[:limit]
+        for name in names:
+            img = cv2.imread(os.path.join(root, label, name))
+            if img is None:
+                continue
+            gray = pre.gray_image(img)
+            h, w = gray.shape
+            box = (0, 0, w, h)
+            if detector:
+                faces = detector.detect(img, gray=gray)
+                if not faces:
+                    continue
+                box = max(faces, key=lambda f: f[2] * f[3])
+            tensors.append(pre.face_tensors([box])[0].copy())
+            labels.append(EMOTIONS.index(label))
+    if not tensors:
+        return np.empty((0, 48, 48, 1), dtype=np.float32), []
+    return np.stack(tensors), labels
+
+
+# Producing models
+def export_float(out_path: str = FLOAT_MODEL):
+    """Export DeepFace's Keras emotion model to ONNX (needs tf2onnx)."""
+    import tf2onnx
+    import tensorflow as tf
+    from emotionModel import DeepFaceEmotion
+
+    model = DeepFaceEmotion().model
+    if model is None:
+        raise RuntimeError("Could not load DeepFace's emotion model.")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    spec = (tf.TensorSpec((None, 48, 48, 1), tf.float32, name="face"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=out_path)
+    return out_path
+
+
+class _Calibration:
+    """CalibrationDataReader over face tensors, one face per batch."""
+
+    def __init__(self, input_name: str, tensors: np.ndarray, channels_first: bool):
+        if channels_first:
+            tensors = tensors.transpose(0, 3, 1, 2)
+        self._it = iter([{input_name: np.ascontiguousarray(t[None])} for t in tensors])
+
+    def get_next(self):
+        return next(self._it, None)
+
+
+def quantize(src: str = FLOAT_MODEL, dst: str = INT8_MODEL, mode: str = "dynamic", calib_dir: str = None,
+             calib_limit: int = 50):
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    if mode == "dynamic":
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+        return dst
+    if not calib_dir:
+        raise ValueError("Static quantization needs --calib pointing at a <emotion>/<image> face set.")
+    tensors, _ = load_labeled(calib_dir, detect=False, limit=calib_limit)
+    if not len(tensors):
+        raise ValueError(f"No calibration images found in {calib_dir}")
+    ref = OnnxEmotion(src)
+    reader = _Calibration(ref.input_name, tensors, ref.channels_first)
+    quantize_static(src, dst, reader, quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QInt8, weight_type=QuantType.QInt8)
+    return dst
+
+
+# Comparison
+def compare(float_model: str, int8_model: str, data_dir: str, detect: bool, threads: int = 1) -> dict:
+    tensors, labels = load_labeled(data_dir, detect)
+    if not len(tensors):
+        raise ValueError(f"No labeled faces found in {data_dir} (expected <emotion>/<image> folders)")
+    models = {"float": OnnxEmotion(float_model, threads=threads), "int8": OnnxEmotion(int8_model, threads=threads)}
+
+    scores, latency = {}, {}
+    for key, model in models.items():
+        model.predict(tensors[:1])     # warm-up
+        out, lat = [], []
+        for i in range(len(tensors)):
+            t0 = time.perf_counter()
+            out.append(model.predict(tensors[i:i + 1])[0])
+            lat.append((time.perf_counter() - t0) * 1000.0)
+        scores[key] = np.stack(out)
+        lat.sort()
+        latency[key] = {"mean_ms": round(float(np.mean(lat)), 3), "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 3)}
+
+    y = np.asarray(labels)
+    top_f, top_q = scores["float"].argmax(axis=1), scores["int8"].argmax(axis=1)
+    drift = np.abs(scores["int8"] - scores["float"])
+    per_class = {}
+    for i, emo in enumerate(EMOTIONS):
+        rows = y == i
+        per_class[emo] = {
+            "samples": int(rows.sum()),
+            # mean |int8 - float| of this class's score, over all faces
+            "mean_abs_drift": round(float(drift[:, i].mean()), 3),
+            "max_abs_drift": round(float(drift[:, i].max()), 3),
+            "accuracy_float": round(float((top_f[rows] == i).mean()), 4) if rows.any() else None,
+            "accuracy_int8": round(float((top_q[rows] == i).mean()), 4) if rows.any() else None,
+        }
+    return {
+        "faces": int(len(y)),
+        "top1_agreement": round(float((top_f == top_q).mean()), 4),
+        "accuracy_float": round(float((top_f == y).mean()), 4),
+        "accuracy_int8": round(float((top_q == y).mean()), 4),
+        "latency": latency,
+        "speedup": round(latency["float"]["mean_ms"] / latency["int8"]["mean_ms"], 3) if latency["int8"]["mean_ms"] else None,
+        "model_bytes": {"float": os.path.getsize(float_model), "int8": os.path.getsize(int8_model)},
+        "per_class": per_class,
+    }
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Build and evaluate an int8 emotion model for onnxruntime.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    e = sub.add_parser("export", help="Export DeepFace's emotion model to float ONNX (needs tf2onnx)")
+    e.add_argument("--out", default=FLOAT_MODEL)
+
+    q = sub.add_parser("quantize", help="Quantize a float ONNX model to int8")
+    q.add_argument("--src", default=FLOAT_MODEL)
+    q.add_argument("--dst", default=INT8_MODEL)
+    q.add_argument("--mode", choices=["dynamic", "static"], default="dynamic")
+    q.add_argument("--calib", default=None, help="Image folder for static calibration (<emotion>/<image>)")
+    q.add_argument("--calib-limit", type=int, default=50, help="Images per class used for calibration")
+
+    c = sub.add_parser("compare", help="Compare float and int8 models on a labeled image set")
+    c.add_argument("data", help="Folder with one sub-folder per emotion, e.g. data/happy/*.jpg")
+    c.add_argument("--float-model", default=FLOAT_MODEL)
+    c.add_argument("--int8-model", default=INT8_MODEL)
+    c.add_argument("--detect", action="store_true", help="Run face detection instead of treating images as crops")
+    c.add_argument("--threads", type=int, default=1, help="onnxruntime intra-op threads")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.cmd == "export":
+            print(f"[Info] Wrote {export_float(args.out)}")
+        elif args.cmd == "quantize":
+            print(f"[Info] Wrote {quantize(args.src, args.dst, args.mode, args.calib, args.calib_limit)}")
+        else:
+            print(json.dumps(compare(args.float_model, args.int8_model, args.data, args.detect, args.threads), indent=2))
+    except (FileNotFoundError, ValueError, RuntimeError, ImportError) as e:
+        print(f"[Error] {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
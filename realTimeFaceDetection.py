@@ -1,28 +1,33 @@
-import cv2
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
 from typing import List, Tuple
 
-try:
-    from deepface import DeepFace
-    HAVE_DEEPFACE = True
-except Exception:
-    DeepFace = None
-    HAVE_DEEPFACE = False
-
-ANALYZE_EVERY = 5  
-MIN_FACE = 60      
-CAM_INDEX = 0   
-
-face_classifier = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
-def detect_bounding_box(bgr_img) -> List[Tuple[int, int, int, int]]:
-    """Find faces and draw green rectangles"""
-    gray = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2GRAY)
-    faces = face_classifier.detectMultiScale(
-        gray, scaleFactor=1.1, minNeighbors=5, minSize=(MIN_FACE, MIN_FACE)
-    )
-    return list(faces)
+import cv2
+
+from captureStream import LatestFrameCapture, LatencyStats, VideoFileSource
+from emotionModel import CLASSIFIERS, HAVE_DEEPFACE, make_classifier
+from faceDetectors import DETECTORS, IMAGE_EXTS, make_detector, set_cv_threads
+from logEmotion import LogEmotion
+from motionGate import MotionGate
+from preprocess import FramePreprocessor
+from segmentLog import SegmentLog
+
+ANALYZE_EVERY = 5
+MIN_FACE = 60
+CAM_INDEX = 0
+CAP_WIDTH = 640
+CAP_HEIGHT = 480
+CAP_FPS = 30
+CAP_FOURCC = "MJPG"
+DETECTOR = "haar"   # "haar" or "yunet"
+CLASSIFIER = "deepface"
+CV_THREADS = None
+WINDOW = "Face + Emotions (press 'q' to quit)"
+STAGES = ("read", "preprocess", "detect", "classify", "display")
 
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
@@ -35,46 +40,198 @@ def draw_emotion_label(frame, x, y, w, h, label, score):
         y_text = clamp(y - 10, 20, frame.shape[0] - 10)
         cv2.putText(frame, txt, (x, y_text), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
-def run():
-    cap = cv2.VideoCapture(CAM_INDEX)
+
+# Sources
+class ImageDirSource:
+    """Images in a folder, in name order, as a capture-like source."""
+
+    def __init__(self, folder: str, loop: bool = False):
+        self.paths = [os.path.join(folder, n) for n in sorted(os.listdir(folder)) if n.lower().endswith(IMAGE_EXTS)]
+        self.loop = loop
+        self._i = 0
+        self.frame_ts = 0.0
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def read(self):
+        while True:
+            if self._i >= len(self.paths):
+                if not self.loop:
+                    return False, None
+                self._i = 0
+            path = self.paths[self._i]
+            self._i += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                self.frame_ts = time.monotonic()
+                return True, frame
+
+    def release(self):
+        pass
+
+
+def open_source(source: str, loop: bool, width=CAP_WIDTH, height=CAP_HEIGHT, fps=CAP_FPS, fourcc=CAP_FOURCC):
+    if source.isdigit():
+        return LatestFrameCapture(int(source), width=width, height=height, fps=fps, fourcc=fourcc).start()
+    if os.path.isdir(source):
+        return ImageDirSource(source, loop=loop)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"No camera, folder or video file at {source}")
+    return VideoFileSource(source, loop=loop)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Run face detection and emotion analysis, headless or with a preview, and print a timing summary.")
+    p.add_argument("--source", default=str(CAM_INDEX), help="Camera index, video file or image folder (default: %(default)s)")
+    p.add_argument("--detector", choices=sorted(DETECTORS), default=DETECTOR)
+    p.add_argument("--classifier", choices=sorted(CLASSIFIERS) + ["none"], default=CLASSIFIER)
+    p.add_argument("--model", default=None, help="Model path for onnx classifiers")
+    p.add_argument("--analyze-every", type=int, default=ANALYZE_EVERY, help="Classify emotions every Nth frame")
+    p.add_argument("--min-face", type=int, default=MIN_FACE, help="Minimum face size in pixels")
+    p.add_argument("--threads", type=int, default=CV_THREADS, help="OpenCV thread count")
+    p.add_argument("--motion-gate", action="store_true", help="Skip detection on frames without motion")
+    p.add_argument("--frames", type=int, default=0, help="Stop after N frames (0: no limit)")
+    p.add_argument("--duration", type=float, default=0.0, help="Stop after N seconds (0: no limit)")
+    p.add_argument("--loop", action="store_true", help="Loop file/folder sources until --frames/--duration")
+    p.add_argument("--no-display", action="store_true", help="Do not open a preview window")
+    p.add_argument("--log", default=None, help="Append detected emotions to this log directory (e.g. stats)")
+    p.add_argument("--name", default="Guest", help="Name recorded with logged emotions")
+    p.add_argument("--width", type=int, default=CAP_WIDTH, help="Requested camera width")
+    p.add_argument("--height", type=int, default=CAP_HEIGHT, help="Requested camera height")
+    p.add_argument("--fps", type=float, default=CAP_FPS, help="Requested camera FPS")
+    p.add_argument("--fourcc", default=CAP_FOURCC, help="Requested camera FOURCC, e.g. MJPG")
+    args = p.parse_args(argv)
+    if args.analyze_every < 1:
+        p.error("--analyze-every must be at least 1")
+    return args
+
+
+def make_emotion_model(args):
+    if args.classifier == "none" or (args.classifier == "deepface" and not HAVE_DEEPFACE):
+        return None
+    kwargs = {"model": args.model} if args.model and args.classifier.startswith("onnx") else {}
+    return make_classifier(args.classifier, **kwargs)
+
+
+def run(argv=None) -> dict:
+    args = parse_args(argv)
+    set_cv_threads(args.threads)
+    detector = make_detector(args.detector, min_face=args.min_face)
+    classifier = make_emotion_model(args)
+    if args.loop and not (args.frames or args.duration):
+        raise ValueError("--loop needs --frames or --duration")
+
+    cap = open_source(args.source, args.loop, args.width, args.height, args.fps, args.fourcc)
     if not cap.isOpened():
-        raise RuntimeError("Could not open webcam. Check CAM_INDEX or permissions.")
+        raise RuntimeError(f"Could not open source {args.source}. Check the camera index, path or permissions.")
 
+    logger = LogEmotion(None, store=SegmentLog(args.log)) if args.log else None
+    pre = FramePreprocessor(max_faces=8)
+    gate = MotionGate() if args.motion_gate else None
+    timing = {s: LatencyStats(window=1_000_000) for s in STAGES}
+    emotions = Counter()
+    faces_total = analyzed = classified = skipped = 0
     frame_idx = 0
+    faces: List[Tuple[int, int, int, int]] = []
     last_emotions: List[Tuple[str, float]] = []
 
+    start = time.perf_counter()
     try:
         while True:
+            if args.frames and frame_idx >= args.frames:
+                break
+            if args.duration and time.perf_counter() - start >= args.duration:
+                break
+
+            t0 = time.perf_counter()
             ok, frame = cap.read()
+            t1 = time.perf_counter()
             if not ok:
                 break
+            timing["read"].add((t1 - t0) * 1000.0)
 
-            faces = detect_bounding_box(frame)
+            if gate is None or gate.check(frame):
+                gray = pre.gray_image(frame)
+                t2 = time.perf_counter()
+                faces = detector.detect(frame, gray=gray)
+                t3 = time.perf_counter()
+                timing["preprocess"].add((t2 - t1) * 1000.0)
+                timing["detect"].add((t3 - t2) * 1000.0)
+                faces_total += len(faces)
+                if gate:
+                    gate.saw_faces(bool(faces))
 
-            if HAVE_DEEPFACE and frame_idx % ANALYZE_EVERY == 0 and faces:
-                last_emotions = []
-                for (x, y, w, h) in faces:
-                    crop = frame[y:y+h, x:x+w]
+                if classifier and faces and frame_idx % args.analyze_every == 0:
+                    tensor = pre.face_tensors(faces)
+                    crops = [frame[y:y + h, x:x + w] for (x, y, w, h) in faces[:len(tensor)]]
                     try:
-                        res = DeepFace.analyze(crop, actions=["emotion"], enforce_detection=False)
-                        if isinstance(res, list) and res:
-                            res = res[0]
-                        emo = res.get("dominant_emotion")
-                        conf = max(res.get("emotion", {}).values()) / 100.0 if "emotion" in res else 0.0
-                        last_emotions.append((emo, conf))
-                    except Exception:
-                        last_emotions.append((None, None))
-            for i, (x, y, w, h) in enumerate(faces):
-                label, score = last_emotions[i] if i < len(last_emotions) else (None, None)
-                draw_emotion_label(frame, x, y, w, h, label, score if score else 0.0)
-
-            cv2.imshow("Face + Emotions (press 'q' to quit)", frame)
+                        results = classifier.classify(tensor, crops=crops)
+                    except Exception as e:
+                        print(f"[Warn] Emotion model error: {e}", file=sys.stderr)
+                        results = []
+                    timing["classify"].add((time.perf_counter() - t3) * 1000.0)
+                    last_emotions = [(emo, conf / 100.0) for emo, conf, _ in results]
+                    emotions.update(emo for emo, _ in last_emotions)
+                    if logger:
+                        for emo, conf, _ in results:
+                            logger.appendJSON(args.name, emo, conf)
+                    analyzed += 1
+                    classified += len(results)
+            else:
+                skipped += 1
+
+            if not args.no_display:
+                t4 = time.perf_counter()
+                for i, (x, y, w, h) in enumerate(faces):
+                    label, score = last_emotions[i] if i < len(last_emotions) else (None, None)
+                    draw_emotion_label(frame, x, y, w, h, label, score if score else 0.0)
+                cv2.imshow(WINDOW, frame)
+                key = cv2.waitKey(1) & 0xFF
+                timing["display"].add((time.perf_counter() - t4) * 1000.0)
+                if key == ord("q"):
+                    frame_idx += 1
+                    break
             frame_idx += 1
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+    except KeyboardInterrupt:
+        pass
     finally:
+        elapsed = time.perf_counter() - start
         cap.release()
-        cv2.destroyAllWindows()
+        if not args.no_display:
+            cv2.destroyAllWindows()
+
+    summary = {
+        "source": args.source,
+        "detector": args.detector,
+        "classifier": args.classifier if classifier else "none",
+        "analyze_every": args.analyze_every,
+        "min_face": args.min_face,
+        "cv_threads": cv2.getNumThreads(),
+        "frames": frame_idx,
+        "seconds": round(elapsed, 3),
+        "fps": round(frame_idx / elapsed, 2) if elapsed else 0.0,
+        "analyzed_frames": analyzed,
+        "gated_frames": skipped,
+        "faces_per_sec": round(faces_total / elapsed, 2) if elapsed else 0.0,
+        "emotions_per_sec": round(classified / elapsed, 2) if elapsed else 0.0,
+        "emotions": dict(emotions),
+        "stages": {s: timing[s].summary() for s in STAGES},
+    }
+    if gate:
+        summary["motion_gate"] = gate.stats()
+    if hasattr(cap, "dropped"):
+        summary["dropped_frames"] = cap.dropped
+    return summary
+
+
+def main(argv=None):
+    try:
+        summary = run(argv)
+    except (RuntimeError, ValueError, FileNotFoundError) as e:
+        print(f"[Error] {e}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(summary))
 
 if __name__ == "__main__":
-    run()
+    main()
@@ -0,0 +1,263 @@
+import json, datetime, os, threading, time
+from typing import List, Optional
+
+from fileLock import FileLock
+
+MANIFEST = "manifest.json"
+LOCKFILE = "manifest.lock"
+
+
+def _to_ts(value, end: bool = False) -> Optional[float]:
+    """Accept epoch seconds, ISO strings, dates or datetimes."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value) if "T" in value or ":" in value else datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        day = datetime.datetime.combine(value, datetime.time.max if end else datetime.time.min)
+        return day.timestamp()
+    raise TypeError(f"Unsupported time value: {value!r}")
+
+
+def _entry_ts(entry) -> float:
+    return datetime.datetime.fromisoformat(entry["datetime"]).timestamp()
+
+
+class SegmentLog:
+    """Append-only emotion log split into capped segment files.
+
+    Entries go to the active segment as JSON lines. A segment is sealed when
+    it reaches `max_bytes` or spans `max_seconds`, and the manifest records
+    the time range it covers. Sealed segments older than `compact_after`
+    seconds are replaced by per-window summaries, and anything older than
+    `retention` seconds is deleted. Readers only open segments overlapping
+    the requested range.
+
+    Writers in any thread or process take an exclusive lock on
+    manifest.lock for each append and for maintenance, so rotation,
+    compaction and appends never interleave. Readers do not lock: the
+    manifest is replaced atomically and a torn last line is skipped.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024, max_seconds: float = 24 * 3600,
+                 compact_after: float = 30 * 86400, retention: float = 365 * 86400,
+                 window_seconds: float = 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compact_after = compact_after
+        self.retention = retention
+        self.window_seconds = window_seconds
+        os.makedirs(directory, exist_ok=True)
+        self.lock = FileLock(self._path(LOCKFILE))
+
+    # Manifest
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def loadManifest(self):
+        try:
+            with open(self._path(MANIFEST), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("segments"), list):
+                return data
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return {"version": 1, "segments": [], "active": None}
+
+    def saveManifest(self, manifest):
+        tmp = self._path(f"{MANIFEST}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self._path(MANIFEST))
+
+    # Writing
+    def append(self, entry) -> dict:
+        with self.lock:
+            return self._append(entry)
+
+    def _append(self, entry) -> dict:
+        ts = _entry_ts(entry)
+        manifest = self.loadManifest()
+        active = manifest.get("active")
+        if active and self._is_full(active, ts):
+            self._seal(manifest)
+            self._maintain(manifest, now=ts)
+            active = None
+        if not active:
+            active = {"file": self._new_segment_name(ts), "start": ts, "last": ts}
+            manifest["active"] = active
+            self.saveManifest(manifest)
+        elif ts > active.get("last", active["start"]) or ts < active["start"]:
+            # The sealed range must end at the last entry, not at whatever
+            # entry arrives after an idle gap
+            active["start"] = min(active["start"], ts)
+            active["last"] = max(active.get("last", ts), ts)
+            self.saveManifest(manifest)
+        with open(self._path(active["file"]), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def _new_segment_name(self, ts: float) -> str:
+        name, n = f"seg-{int(ts * 1000)}.jsonl", 0
+        while os.path.exists(self._path(name)):
+            n += 1
+            name = f"seg-{int(ts * 1000)}-{n}.jsonl"
+        return name
+
+    def _is_full(self, active, ts: float) -> bool:
+        if ts - active["start"] >= self.max_seconds:
+            return True
+        try:
+            return os.path.getsize(self._path(active["file"])) >= self.max_bytes
+        except FileNotFoundError:
+            return False
+
+    def _seal(self, manifest):
+        active = manifest["active"]
+        end = active.get("last", active["start"])
+        manifest["segments"].append({"file": active["file"], "kind": "raw", "start": active["start"], "end": end})
+        manifest["active"] = None
+
+    # Maintenance
+    def maintain(self, manifest=None, now: Optional[float] = None):
+        """Compact old segments and drop those past retention."""
+        with self.lock:
+            return self._maintain(manifest, now)
+
+    def _maintain(self, manifest=None, now: Optional[float] = None):
+        if manifest is None:
+            manifest = self.loadManifest()
+        now = time.time() if now is None else now
+        # An installation that stopped writing still has to age out its last segment
+        active = manifest.get("active")
+        if active and now - active.get("last", active["start"]) >= self.max_seconds:
+            self._seal(manifest)
+        keep, doomed = [], []
+        for seg in manifest["segments"]:
+            if seg["end"] < now - self.retention:
+                doomed.append(seg["file"])
+            elif seg["kind"] == "raw" and seg["end"] < now - self.compact_after:
+                keep.append(self._compact(seg))
+                doomed.append(seg["file"])
+            else:
+                keep.append(seg)
+        manifest["segments"] = keep
+        self.saveManifest(manifest)
+        for name in doomed:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+        return manifest
+
+    def _compact(self, seg) -> dict:
+        windows = {}
+        for entry in self._read_raw(seg["file"]):
+            ts = _entry_ts(entry)
+            w = ts - ts % self.window_seconds
+            key = (w, entry.get("name"), entry.get("emotion"))
+            s = windows.setdefault(key, {"count": 0, "total": 0.0, "min": None, "max": None})
+            pct = float(entry.get("percentage") or 0)
+            s["count"] += 1
+            s["total"] += pct
+            s["min"] = pct if s["min"] is None else min(s["min"], pct)
+            s["max"] = pct if s["max"] is None else max(s["max"], pct)
+
+        rows = []
+        for (w, name, emotion), s in sorted(windows.items(), key=lambda kv: kv[0][0]):
+            rows.append({
+                "window": datetime.datetime.fromtimestamp(w).isoformat(),
+                "seconds": self.window_seconds,
+                "name": name,
+                "emotion": emotion,
+                "count": s["count"],
+                "mean_percentage": round(s["total"] / s["count"], 2),
+                "min_percentage": s["min"],
+                "max_percentage": s["max"],
+            })
+        name = seg["file"].replace("seg-", "sum-").replace(".jsonl", ".json")
+        with open(self._path(name), "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        return {"file": name, "kind": "summary", "start": seg["start"], "end": seg["end"]}
+
+    # Reading
+    def _read_raw(self, name: str) -> List[dict]:
+        rows = []
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue    # torn tail after a crash
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def _overlapping(self, kind: str, start: Optional[float], end: Optional[float]):
+        manifest = self.loadManifest()
+        segs = [s for s in manifest["segments"] if s["kind"] == kind]
+        active = manifest.get("active")
+        if kind == "raw" and active:
+            segs.append({"file": active["file"], "start": active["start"], "end": float("inf")})
+        for seg in sorted(segs, key=lambda s: s["start"]):
+            if start is not None and seg["end"] < start:
+                continue
+            if end is not None and seg["start"] > end:
+                continue
+            yield seg
+
+    def read(self, start=None, end=None) -> List[dict]:
+        """Raw entries with start <= datetime <= end."""
+        lo, hi = _to_ts(start), _to_ts(end, end=True)
+        out = []
+        for seg in self._overlapping("raw", lo, hi):
+            for entry in self._read_raw(seg["file"]):
+                try:
+                    ts = _entry_ts(entry)
+                except (KeyError, ValueError):
+                    continue
+                if (lo is None or ts >= lo) and (hi is None or ts <= hi):
+                    out.append(entry)
+        return out
+
+    def summaries(self, start=None, end=None) -> List[dict]:
+        """Per-window summaries of compacted segments overlapping the range."""
+        lo, hi = _to_ts(start), _to_ts(end, end=True)
+        out = []
+        for seg in self._overlapping("summary", lo, hi):
+            try:
+                with open(self._path(seg["file"]), "r", encoding="utf-8") as f:
+                    rows = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            for row in rows:
+                w = _to_ts(row["window"])
+                if (lo is None or w + row["seconds"] > lo) and (hi is None or w <= hi):
+                    out.append(row)
+        return out
+
+    def importLegacy(self, filename: str) -> int:
+        """Move entries from an old single-file stats.json into segments."""
+        with self.lock:
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return 0
+            if not isinstance(data, list):
+                return 0
+            rows = [e for e in data if isinstance(e, dict) and "datetime" in e]
+            rows.sort(key=_entry_ts)
+            for entry in rows:
+                self._append(entry)
+            os.replace(filename, f"{filename}.imported")
+            return len(rows)
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# headless unless told otherwise
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtWidgets
+
+from main import APP_STYLES, MainWindow
+from memoryProfile import MemoryMonitor
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Replay frames through the app for hours and fail if memory keeps growing.")
+    p.add_argument("source", help="Video file or image sequence pattern (e.g. frames/%%05d.jpg); replayed in a loop at its own frame rate")
+    p.add_argument("--hours", type=float, default=2.0)
+    p.add_argument("--interval", type=float, default=60.0, help="Seconds between memory samples")
+    p.add_argument("--warmup", type=float, default=300.0, help="Seconds before the RSS baseline is taken")
+    p.add_argument("--max-growth-mb", type=float, default=50.0, help="Allowed RSS growth over the baseline")
+    p.add_argument("--out", default="memory.jsonl", help="Time series output (JSON lines)")
+    p.add_argument("--no-breathing", action="store_true", help="Do not run the breathing animation alongside")
+    p.add_argument("--fail-fast", action="store_true", help="Stop at the first sample over the threshold")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = os.path.abspath(args.source)
+    out = os.path.abspath(args.out)
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    app.setStyleSheet(APP_STYLES)
+    win = MainWindow()
+    win.show()
+    # keep replay logs out of the real stats/ directory
+    os.chdir(tempfile.mkdtemp(prefix="soak-"))
+
+    roots = {type(p).__name__: p for p in (win.page1, win.page2, win.page3)}
+    monitor = MemoryMonitor(out, qt_roots=roots)
+    state = {"baseline": None, "max_growth": 0.0, "failed": False, "restarts": 0}
+
+    def check_replay():
+        # one worker loops the file for the whole run; a restart means it died
+        if win.page3.worker is None:
+            if win.page3._frames == 0:
+                # never produced a frame (e.g. the source did not open); restarting won't help
+                print(f"[Warn] Replay never started ({win.page3.statusLine.text()}).")
+                app.quit()
+                return
+            state["restarts"] += 1
+            print(f"[Warn] Replay worker stopped ({win.page3.statusLine.text()}); restarting.")
+            win.page3.start_camera(source, loop=True)
+
+    def sample():
+        row = monitor.sample()
+        if row["t"] < args.warmup:
+            return
+        if state["baseline"] is None:
+            state["baseline"] = row["rss_mb"]
+            return
+        growth = row["rss_mb"] - state["baseline"]
+        state["max_growth"] = max(state["max_growth"], growth)
+        if growth > args.max_growth_mb:
+            state["failed"] = True
+            print(f"[Warn] RSS grew {growth:.1f} MB over baseline at t={row['t']:.0f}s")
+            if args.fail_fast:
+                app.quit()
+
+    win.stacked.setCurrentIndex(2)
+    if not args.no_breathing:
+        win.page2.start_box()
+
+    replay = QtCore.QTimer()
+    replay.timeout.connect(check_replay)
+    replay.start(5000)
+    sampler = QtCore.QTimer()
+    sampler.timeout.connect(sample)
+    sampler.start(int(args.interval * 1000))
+    QtCore.QTimer.singleShot(int(args.hours * 3600 * 1000), app.quit)
+
+    win.page3.start_camera(source, loop=True)
+    monitor.sample()
+    app.exec()
+
+    replay.stop()
+    sampler.stop()
+    win.page3.stop_camera()
+    sample()
+    monitor.stop()
+
+    # A run that replayed nothing or never measured growth proves nothing
+    frames = win.page3._frames
+    problems = []
+    if frames == 0:
+        problems.append("no frames reached the camera page")
+    if state["restarts"]:
+        problems.append(f"replay worker restarted {state['restarts']} time(s)")
+    if state["baseline"] is None:
+        problems.append("run ended before the warm-up finished; no growth check done")
+    for problem in problems:
+        print(f"[Warn] {problem}")
+    failed = state["failed"] or bool(problems)
+    summary = {
+        "samples": monitor.samples,
+        "baseline_rss_mb": state["baseline"],
+        "max_growth_mb": round(state["max_growth"], 2),
+        "threshold_mb": args.max_growth_mb,
+        "frames_shown": frames,
+        "replay_restarts": state["restarts"],
+        "passed": not failed,
+        "series": out,
+    }
+    print(json.dumps(summary))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
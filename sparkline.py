@@ -0,0 +1,41 @@
+import math
+
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor, QPen, QPainterPath
+from PySide6.QtCore import Qt, QPointF
+
+class Sparkline(QWidget):
+    def __init__(self):
+        super().__init__()
+        self._values = []
+        self.setMinimumSize(300, 48)
+
+    def setValues(self, values):
+        # values are 0..1, NaN marks an empty slot
+        self._values = [float(v) for v in values]
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor("#0a0f21"))
+        if len(self._values) < 2:
+            return
+
+        w, h = self.width(), self.height()
+        step = w / (len(self._values) - 1)
+        path = QPainterPath()
+        pen_down = False
+        for i, v in enumerate(self._values):
+            if math.isnan(v):
+                pen_down = False
+                continue
+            pt = QPointF(i * step, h - 4 - v * (h - 8))
+            if pen_down:
+                path.lineTo(pt)
+            else:
+                path.moveTo(pt)
+                pen_down = True
+
+        painter.setPen(QPen(QColor("#4662ff"), 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        painter.drawPath(path)